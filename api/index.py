@@ -10,12 +10,16 @@ from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
-import tempfile
+import asyncio
 import os
 import sys
+from datetime import timedelta
+from functools import cache
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
 import firebase_admin
+import orjson
 from firebase_admin import credentials, auth as firebase_auth, storage as firebase_storage
 
 # ── Init Firebase Admin SDK ──────────────────────────────────────────────────
@@ -23,10 +27,9 @@ from firebase_admin import credentials, auth as firebase_auth, storage as fireba
 # OR embed the JSON directly as FIREBASE_SERVICE_ACCOUNT env var
 
 if not firebase_admin._apps:
-    import json
     sa_json = os.environ.get("FIREBASE_SERVICE_ACCOUNT")
     if sa_json:
-        cred = credentials.Certificate(json.loads(sa_json))
+        cred = credentials.Certificate(orjson.loads(sa_json))
     else:
         # Fallback: use default credentials (Cloud Run / GCP environment)
         cred = credentials.ApplicationDefault()
@@ -35,6 +38,13 @@ if not firebase_admin._apps:
         'storageBucket': os.environ.get("VITE_FIREBASE_STORAGE_BUCKET", "")
     })
 
+# Resolved on first use, then reused so warm invocations share the same Storage
+# client (and its pooled HTTP session). Kept lazy so a missing bucket name or
+# credentials doesn't break importing the app (e.g. /api/health, local dev).
+@cache
+def get_bucket():
+    return firebase_storage.bucket()
+
 # ── FastAPI App ───────────────────────────────────────────────────────────────
 app = FastAPI(title="Verbatim Extractor API")
 
@@ -62,7 +72,7 @@ async def verify_token(authorization: Optional[str] = Header(None)):
 class ProcessRequest(BaseModel):
     storage_path: str       # Firebase Storage path e.g. uploads/uid/timestamp_file.docx
     filename: str           # Original filename
-    mode: str               # 'both' | 'highlighted' | 'underlined'
+    mode: str               # 'both' | 'highlighted' | 'underlined' | 'and'
     user_id: str
 
 
@@ -71,130 +81,17 @@ class ProcessResponse(BaseModel):
     output_filename: str
 
 
-# ── Extractor Logic (inlined from verbatim_extractor.py) ─────────────────────
-from docx import Document
-from docx.oxml.ns import qn
-
-
-def run_is_highlighted(run):
-    rpr = run._r.find(qn('w:rPr'))
-    if rpr is None: return False
-    
-    # Check standard highlight
-    highlight = rpr.find(qn('w:highlight'))
-    if highlight is not None:
-        val = highlight.get(qn('w:val'), '')
-        if val.lower() not in ('', 'none'):
-            return True
-    
-    # Check background shading (often used when pasting from web)
-    shd = rpr.find(qn('w:shd'))
-    if shd is not None:
-        fill = shd.get(qn('w:fill'), '')
-        if fill.lower() not in ('', 'auto', 'ffffff', 'none'):
-            return True
-    
-    return False
-
-
-def run_is_underlined(run):
-    rpr = run._r.find(qn('w:rPr'))
-    if rpr is None: return False
-    u = rpr.find(qn('w:u'))
-    if u is None: return False
-    val = u.get(qn('w:val'), 'single')
-    return val.lower() != 'none'
-
-
-def run_is_bold(run):
-    rpr = run._r.find(qn('w:rPr'))
-    if rpr is None: return False
-    b = rpr.find(qn('w:b'))
-    return b is not None
-
-
-def paragraph_is_structural(para):
-    style_name = (para.style.name or '').lower()
-    if any(k in style_name for k in ('heading', 'block', 'tag', 'cite', 'title')):
-        return True
-    runs = [r for r in para.runs if r.text.strip()]
-    if not runs: return False
-    return all(run_is_bold(r) for r in runs)
-
-
-def run_passes(run, mode):
-    if mode == 'highlighted':
-        return run_is_highlighted(run)
-    elif mode == 'underlined':
-        return run_is_underlined(run)
-    else:  # both (OR)
-        return run_is_highlighted(run) or run_is_underlined(run)
-
-
-def paragraph_has_marked_runs(para, mode):
-    for run in para.runs:
-        if run.text.strip() and run_passes(run, mode):
-            return True
-    return False
-
-
-def filter_paragraph_runs(para, mode):
-    if paragraph_is_structural(para):
-        return True
-
-    runs_to_remove = []
-    prev_kept = False
-    for run in para.runs:
-        if not run.text.strip():
-            continue
-        keep = run_passes(run, mode)
-        if not keep:
-            runs_to_remove.append(run)
-        else:
-            if prev_kept and not run.text.startswith(' '):
-                run.text = ' ' + run.text
-            prev_kept = True
-
-    for run in runs_to_remove:
-        run._r.getparent().remove(run._r)
-
-    remaining = [r for r in para.runs if r.text.strip()]
-    return len(remaining) > 0
+# ── Extractor Logic (shared with the CLI scripts) ────────────────────────────
+# verbatim_core.py lives at the repo root, one level above this file
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from verbatim_core import extract_document
 
 
-def extract_document(input_path: str, output_path: str, mode: str):
-    out_doc = Document(input_path)
-    paras_to_remove = []
-    prev_was_structural = False
-
-    for para in out_doc.paragraphs:
-        is_structural = paragraph_is_structural(para)
-        if is_structural or prev_was_structural:
-            prev_was_structural = is_structural
-            continue
-        prev_was_structural = False
-
-        if not paragraph_has_marked_runs(para, mode):
-            paras_to_remove.append(para)
-        else:
-            has_content = filter_paragraph_runs(para, mode)
-            if not has_content:
-                paras_to_remove.append(para)
-
-    for para in paras_to_remove:
-        para._element.getparent().remove(para._element)
-
-    # Clean up double-empty paragraphs
-    all_paras = out_doc.element.body.findall('.//' + qn('w:p'))
-    prev_empty = False
-    for p_el in all_paras:
-        texts = ''.join(t.text or '' for t in p_el.iter(qn('w:t')))
-        is_empty = not texts.strip()
-        if is_empty and prev_empty:
-            p_el.getparent().remove(p_el)
-        prev_empty = is_empty
-
-    out_doc.save(output_path)
+def delete_quietly(blob):
+    try:
+        blob.delete()
+    except Exception:
+        pass  # Non-critical
 
 
 # ── API Endpoint ──────────────────────────────────────────────────────────────
@@ -207,41 +104,49 @@ async def process_document(
     if user["uid"] != body.user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    bucket = firebase_storage.bucket()
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Download from Firebase Storage
-        input_path = os.path.join(tmpdir, "input.docx")
-        blob = bucket.blob(body.storage_path)
-        blob.download_to_filename(input_path)
-
-        # Process
-        stem = Path(body.filename).stem
-        output_filename = f"{stem}_read-doc.docx"
-        output_path = os.path.join(tmpdir, output_filename)
-
-        try:
-            extract_document(input_path, output_path, body.mode)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
-
-        # Upload processed file back to Firebase Storage
-        output_storage_path = f"outputs/{body.user_id}/{output_filename}"
-        output_blob = bucket.blob(output_storage_path)
-        output_blob.upload_from_filename(output_path, content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    # Download from Firebase Storage straight into memory (no /tmp round-trip).
+    # blob.chunk_size is deliberately left unset: that keeps the download a
+    # single GET, and uploads go out as one multipart request up to 8 MiB and
+    # as resumable 100 MiB chunks above that; a smaller chunk size would only
+    # add round-trips.
+    bucket = get_bucket()
+    blob = bucket.blob(body.storage_path)
+    input_buf = BytesIO(await asyncio.to_thread(blob.download_as_bytes))
+
+    # Process
+    stem = Path(body.filename).stem
+    output_filename = f"{stem}_read-doc.docx"
+    output_buf = BytesIO()
+
+    # CPU-bound; run in the default thread pool so the event loop keeps serving
+    try:
+        await asyncio.to_thread(extract_document, input_buf, output_buf, body.mode)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
 
-        # Generate signed download URL (valid 1 hour)
-        from datetime import timedelta
-        download_url = output_blob.generate_signed_url(
+    # Upload processed file back to Firebase Storage. On failure the input is
+    # left in place so the user can retry.
+    output_storage_path = f"outputs/{body.user_id}/{output_filename}"
+    output_blob = bucket.blob(output_storage_path)
+    try:
+        await asyncio.to_thread(
+            output_blob.upload_from_string,
+            output_buf.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    # Delete the uploaded input now that the output is safely stored; the
+    # Storage round-trip overlaps with signing the download URL (valid 1 hour)
+    _, download_url = await asyncio.gather(
+        asyncio.to_thread(delete_quietly, blob),
+        asyncio.to_thread(
+            output_blob.generate_signed_url,
             expiration=timedelta(hours=1),
             method="GET",
-        )
-
-        # Delete the uploaded input file immediately after processing
-        try:
-            bucket.blob(body.storage_path).delete()
-        except Exception:
-            pass  # Non-critical
+        ),
+    )
 
     return ProcessResponse(
         download_url=download_url,
@@ -250,7 +155,7 @@ async def process_document(
 
 
 @app.get("/api/health")
-async def health():
+async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
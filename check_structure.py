@@ -1,42 +1,40 @@
 #!/usr/bin/env python3
-"""Check which paragraphs are detected as structural (tags/cites)."""
+"""Check which paragraphs are detected as structural (tags/cites).
+
+word/document.xml is streamed paragraph by paragraph rather than loaded as a
+whole Document, so memory stays flat on large files.
+"""
 
 import sys
-from pathlib import Path
-from docx import Document
-from docx.oxml.ns import qn
-
-def run_is_bold(run):
-    rpr = run._r.find(qn('w:rPr'))
-    if rpr is None:
-        return False
-    b = rpr.find(qn('w:b'))
-    return b is not None
-
-def paragraph_is_structural(para):
-    style_name = (para.style.name or '').lower()
-    if any(k in style_name for k in ('heading', 'block', 'tag', 'cite', 'title')):
-        return True
-    runs = [r for r in para.runs if r.text.strip()]
-    if not runs:
-        return False
-    return all(run_is_bold(r) for r in runs)
+import zipfile
+from docx.oxml import parse_xml
+from docx.styles.styles import Styles
+from verbatim_core import iter_body_paragraphs, paragraph_is_structural, paragraph_style_names, run_is_bold, text_runs
+
+def load_style_names(zf):
+    if 'word/styles.xml' not in zf.namelist():
+        return {None: ''}
+    return paragraph_style_names(Styles(parse_xml(zf.read('word/styles.xml'))))
 
 def check_structure(input_path):
-    doc = Document(input_path)
-    
-    for i, para in enumerate(doc.paragraphs[:20]):  # First 20 paragraphs
-        if not para.text.strip():
-            continue
-        
-        is_struct = paragraph_is_structural(para)
-        marker = "[STRUCTURAL]" if is_struct else "[BODY]"
-        
-        print(f"{marker} Para {i}: {para.text[:80]}")
-        if not is_struct:
-            runs = [r for r in para.runs if r.text.strip()]
-            bold_count = sum(1 for r in runs if run_is_bold(r))
-            print(f"  -> {bold_count}/{len(runs)} runs are bold")
+    with zipfile.ZipFile(input_path) as zf:
+        style_names = load_style_names(zf)
+
+        for i, p_el in enumerate(iter_body_paragraphs(zf)):
+            if i >= 20:  # First 20 paragraphs
+                break
+            text = p_el.text
+            if not text.strip():
+                continue
+
+            runs = text_runs(p_el)
+            is_struct = paragraph_is_structural(p_el, style_names, runs)
+            marker = "[STRUCTURAL]" if is_struct else "[BODY]"
+
+            print(f"{marker} Para {i}: {text[:80]}")
+            if not is_struct:
+                bold_count = sum(1 for r_el, _ in runs if run_is_bold(r_el))
+                print(f"  -> {bold_count}/{len(runs)} runs are bold")
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -1,49 +1,53 @@
 #!/usr/bin/env python3
-"""Debug script to check formatting in a Word document."""
+"""Debug script to check formatting in a Word document.
+
+word/document.xml is streamed paragraph by paragraph rather than loaded as a
+whole Document, so memory stays flat on large files.
+"""
 
 import sys
-from pathlib import Path
-from docx import Document
-from docx.oxml.ns import qn
+import zipfile
+from verbatim_core import W_HIGHLIGHT, W_R, W_RPR, W_U, W_VAL, iter_body_paragraphs
 
 def check_formatting(input_path):
-    doc = Document(input_path)
-    
-    for i, para in enumerate(doc.paragraphs):
-        if not para.text.strip():
-            continue
-            
-        print(f"\n--- Paragraph {i} ---")
-        print(f"Text preview: {para.text[:100]}")
-        
-        for j, run in enumerate(para.runs):
-            if not run.text.strip():
+    with zipfile.ZipFile(input_path) as zf:
+        for i, p_el in enumerate(iter_body_paragraphs(zf)):
+            text = p_el.text
+            if not text.strip():
                 continue
-                
-            rpr = run._r.find(qn('w:rPr'))
-            
-            # Check highlight
-            highlight = None
-            if rpr is not None:
-                h = rpr.find(qn('w:highlight'))
-                if h is not None:
-                    highlight = h.get(qn('w:val'), 'NO_VAL')
-            
-            # Check underline
-            underline = None
-            if rpr is not None:
-                u = rpr.find(qn('w:u'))
-                if u is not None:
-                    underline = u.get(qn('w:val'), 'NO_VAL')
-            
-            if highlight or underline:
-                print(f"  Run {j}: '{run.text[:50]}'")
-                print(f"    Highlight: {highlight}")
-                print(f"    Underline: {underline}")
+
+            print(f"\n--- Paragraph {i} ---")
+            print(f"Text preview: {text[:100]}")
+
+            for j, r_el in enumerate(p_el.iterchildren(W_R)):
+                run_text = r_el.text
+                if not run_text.strip():
+                    continue
+
+                rpr = r_el.find(W_RPR)
+
+                # Check highlight
+                highlight = None
+                if rpr is not None:
+                    h = rpr.find(W_HIGHLIGHT)
+                    if h is not None:
+                        highlight = h.get(W_VAL, 'NO_VAL')
+
+                # Check underline
+                underline = None
+                if rpr is not None:
+                    u = rpr.find(W_U)
+                    if u is not None:
+                        underline = u.get(W_VAL, 'NO_VAL')
+
+                if highlight or underline:
+                    print(f"  Run {j}: '{run_text[:50]}'")
+                    print(f"    Highlight: {highlight}")
+                    print(f"    Underline: {underline}")
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
         print("Usage: python debug_formatting.py input.docx")
         sys.exit(1)
-    
+
     check_formatting(sys.argv[1])
@@ -0,0 +1,293 @@
+"""
+Verbatim Extractor — shared core
+=================================
+Run/paragraph classification and the extraction pass used by the FastAPI
+backend (api/index.py), the CLI extractors and the diagnostic scripts.
+
+Everything here works on raw lxml elements (<w:p>, <w:r>) rather than
+python-docx Paragraph/Run wrappers. Tag names are resolved and XPath
+expressions compiled once at import.
+"""
+
+import re
+from typing import IO, Union
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from docx.oxml.parser import element_class_lookup
+from lxml import etree
+
+
+W_BODY, W_P, W_R, W_T = qn('w:body'), qn('w:p'), qn('w:r'), qn('w:t')
+W_RPR, W_HIGHLIGHT, W_U, W_B = qn('w:rPr'), qn('w:highlight'), qn('w:u'), qn('w:b')
+W_PPR, W_PSTYLE = qn('w:pPr'), qn('w:pStyle')
+W_VAL, W_FILL = qn('w:val'), qn('w:fill')
+
+NSMAP = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+_XP_RPR = etree.XPath('w:rPr', namespaces=NSMAP)
+_XP_HIGHLIGHT = etree.XPath('w:highlight', namespaces=NSMAP)
+_XP_SHD = etree.XPath('w:shd', namespaces=NSMAP)
+_XP_U = etree.XPath('w:u', namespaces=NSMAP)
+
+# "Paragraph has a marked run" screens, one per mode, evaluated by libxml2 in
+# a single call. They mirror run_flags (w:highlight, w:fill and w:u values compared
+# case-insensitively) but ignore run text, so they may over-match but never
+# miss a run that run_passes would keep.
+_LOWER = "translate({}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+_HI = (
+    "w:rPr/w:highlight[string(@w:val) != '' and {0} != 'none']"
+    " or w:rPr/w:shd[not({1} = '' or {1} = 'auto' or {1} = 'ffffff' or {1} = 'none')]"
+).format(_LOWER.format('@w:val'), _LOWER.format('string(@w:fill)'))
+_UL = "w:rPr/w:u[not(@w:val) or {} != 'none']".format(_LOWER.format('@w:val'))
+_UL_EXPLICIT = "w:rPr/w:u[string(@w:val) != '' and {} != 'none']".format(_LOWER.format('@w:val'))
+_XP_MARKED = {
+    mode: etree.XPath(f'boolean(w:r[{cond}])', namespaces=NSMAP)
+    for mode, cond in (
+        ('highlighted', _HI),
+        ('underlined', _UL),
+        ('both', f'{_HI} or {_UL}'),
+        ('and', f'({_HI}) and ({_UL_EXPLICIT})'),
+    )
+}
+
+# Style-name keywords marking tags, cites and block headers
+_STRUCT_RE = re.compile(r'heading|block|tag|cite|title')
+
+
+# ---------------------------------------------------------------------------
+# Run / paragraph classification
+# ---------------------------------------------------------------------------
+
+def run_flags(r_el, strict_underline=False):
+    """
+    Return (highlighted, underlined) for a <w:r> element.
+    w:rPr is looked up once and shared by both checks.
+
+    highlighted: ANY highlight color set (any color, not 'none'), or real shading
+    underlined:  underline formatting that isn't explicitly turned off; with
+                 strict_underline (the 'and' mode) <w:u/> or an empty w:val
+                 does not count, as verbatim_extractor_and.py has always treated it
+    """
+    rpr_list = _XP_RPR(r_el)
+    if not rpr_list:
+        return (False, False)
+    rpr = rpr_list[0]
+
+    # Check standard highlight — the common marker, so it is tested first.
+    # Word writes lowercase values ('yellow', 'none'), so .lower() is only
+    # needed for the rare mixed-case value ('None', 'NONE', 'darkBlue')
+    highlight = _XP_HIGHLIGHT(rpr)
+    val = highlight[0].get(W_VAL) if highlight else None
+    hi = bool(val) and val != 'none' and (val.islower() or val.lower() != 'none')
+
+    # Check background shading (often used when pasting from web)
+    if not hi:
+        shd = _XP_SHD(rpr)
+        if shd:
+            fill = shd[0].get(W_FILL, '')
+            # 'auto' or empty means no shading
+            hi = fill.lower() not in ('', 'auto', 'ffffff', 'none')
+
+    ul = False
+    u = _XP_U(rpr)
+    if u:
+        if strict_underline:
+            ul = u[0].get(W_VAL, '').lower() not in ('', 'none')
+        else:
+            val = u[0].get(W_VAL, 'single')  # default to 'single' if no value
+            # 'none' explicitly turns underline off
+            ul = val.lower() != 'none'
+
+    return (hi, ul)
+
+
+def run_is_bold(r_el):
+    """Bold-only fast path for the structural check; skips the highlight/underline lookups."""
+    rpr = r_el.find(W_RPR)
+    return rpr is not None and rpr.find(W_B) is not None
+
+
+def run_passes(r_el, mode):
+    """
+    Return True if this run is kept under `mode`: 'highlighted', 'underlined',
+    'both' (either one) or 'and' (highlighted and explicitly underlined).
+    """
+    hi, ul = run_flags(r_el, strict_underline=(mode == 'and'))
+    if mode == 'highlighted':
+        return hi
+    elif mode == 'underlined':
+        return ul
+    elif mode == 'and':
+        return hi and ul
+    else:  # both (OR)
+        return hi or ul
+
+
+def paragraph_style_names(styles):
+    """
+    Map paragraph style id -> lowercased style name for a python-docx Styles
+    object. The None key holds the default paragraph style, which applies to
+    paragraphs without a w:pStyle (or with an unknown one).
+    """
+    names = {None: ''}
+    for style in styles:
+        if style.type == WD_STYLE_TYPE.PARAGRAPH:
+            names[style.style_id] = (style.name or '').lower()
+    default = styles.default(WD_STYLE_TYPE.PARAGRAPH)
+    if default is not None:
+        names[None] = (default.name or '').lower()
+    return names
+
+
+def paragraph_style_id(p_el):
+    """Return the w:pStyle id of a <w:p> element, or None if it has none."""
+    ppr = p_el.find(W_PPR)
+    if ppr is None:
+        return None
+    pstyle = ppr.find(W_PSTYLE)
+    return None if pstyle is None else pstyle.get(W_VAL)
+
+
+def text_runs(p_el):
+    """
+    Return [(r_el, text), ...] for the runs of a <w:p> that have non-blank text.
+    Computed once per paragraph and shared by the structural check and the
+    run filter, since building a run's text is the costly part of both.
+    """
+    runs = []
+    for r_el in p_el.iterchildren(W_R):
+        text = r_el.text
+        if text.strip():
+            runs.append((r_el, text))
+    return runs
+
+
+def paragraph_is_structural(p_el, style_names, runs=None):
+    """
+    Heuristic: a paragraph is a 'structural' paragraph (tag, cite, block header)
+    if ALL of its non-empty runs are bold, or if the paragraph style suggests a heading.
+    These should be kept regardless of highlight/underline status.
+    `runs` is the paragraph's text_runs() if the caller already has it.
+    """
+    style_name = style_names.get(paragraph_style_id(p_el), style_names[None])
+    if _STRUCT_RE.search(style_name):
+        return True
+
+    if runs is None:
+        runs = text_runs(p_el)
+    if not runs:
+        return False  # empty paragraph
+
+    # If every non-empty run is bold → treat as structural (stops at the first non-bold run)
+    return all(run_is_bold(r_el) for r_el, _ in runs)
+
+
+def filter_paragraph_runs(p_el, mode, runs=None):
+    """
+    Remove runs that don't pass the filter from a non-structural paragraph.
+    Returns True if any runs remain. `runs` is as for paragraph_is_structural.
+
+    A single scan both detects whether any run is marked and collects the
+    unmarked ones; if nothing is marked the paragraph is left untouched and
+    False is returned so the caller can drop it.
+    """
+    # Cheap screen first: most body paragraphs in a cut deck have no marks
+    if not _XP_MARKED.get(mode, _XP_MARKED['both'])(p_el):
+        return False  # no marked content at all
+
+    if runs is None:
+        runs = text_runs(p_el)
+
+    runs_to_remove = []
+    kept = 0
+    for r_el, text in runs:
+        if not run_passes(r_el, mode):
+            runs_to_remove.append(r_el)
+        else:
+            # Add space before this run if previous run was also kept
+            if kept and not text.startswith(' '):
+                r_el.text = ' ' + text
+            kept += 1
+
+    if not kept:
+        return False  # no marked content at all
+
+    for r_el in runs_to_remove:
+        p_el.remove(r_el)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Main extraction logic
+# ---------------------------------------------------------------------------
+
+def extract_document(input_file: Union[str, IO[bytes]], output_file: Union[str, IO[bytes]], mode: str = 'both') -> int:
+    """
+    Strip un-marked body text from a document, keeping structural paragraphs
+    (tags, cites, block headers) and the paragraph right after each one.
+    Paths or in-memory file objects are both accepted.
+
+    Returns the number of body paragraphs removed for having no marked content.
+    """
+    out_doc = Document(input_file)  # start from same doc to preserve styles/formatting
+    body = out_doc.element.body
+    style_names = paragraph_style_names(out_doc.styles)
+    paras_to_remove = []  # (parent, paragraph), in document order
+    removed = 0
+    prev_was_structural = False
+    prev_empty = False
+
+    # Single pass: filter top-level paragraphs and collapse consecutive empty
+    # paragraphs (including those nested in tables) as we go
+    for child in body.iterchildren():
+        if child.tag == W_P:
+            runs = text_runs(child)
+            is_structural = paragraph_is_structural(child, style_names, runs)
+
+            # Keep structural paragraphs and the paragraph immediately after (cite)
+            if is_structural or prev_was_structural:
+                prev_was_structural = is_structural
+            else:
+                prev_was_structural = False
+                if not filter_paragraph_runs(child, mode, runs):
+                    paras_to_remove.append((body, child))
+                    removed += 1
+                    continue
+
+        for p_el in child.iter(W_P):
+            # Stops at the first non-blank <w:t> instead of joining all text
+            is_empty = not any(t.text and t.text.strip() for t in p_el.iter(W_T))
+            if is_empty and prev_empty:
+                paras_to_remove.append((p_el.getparent(), p_el))
+            prev_empty = is_empty
+
+    # Removals are batched after the scan and applied back to front, so each
+    # one only touches siblings that have already been processed
+    for parent, p_el in reversed(paras_to_remove):
+        parent.remove(p_el)
+
+    out_doc.save(output_file)
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Streaming (read-only) access
+# ---------------------------------------------------------------------------
+
+def iter_body_paragraphs(zf):
+    """
+    Yield the top-level <w:p> elements of an open .docx ZipFile one at a time,
+    discarding each once used, so memory stays flat on large files.
+    python-docx element classes are kept (p_el.text, p_el.style, r_el.text work).
+    """
+    with zf.open('word/document.xml') as stream:
+        events = etree.iterparse(stream, tag=W_P, remove_blank_text=True)
+        events.set_element_class_lookup(element_class_lookup)
+        for _, p_el in events:
+            parent = p_el.getparent()
+            if parent is None or parent.tag != W_BODY:
+                continue  # nested (e.g. table cell) paragraph
+            yield p_el
+            p_el.clear()
+            while p_el.getprevious() is not None:
+                del parent[0]